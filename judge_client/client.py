@@ -1,18 +1,37 @@
 # coding=utf-8
+import io
+import os
 import six
+import stat
 import socket
 from collections import namedtuple
 from decimal import Decimal
-from xml.etree import ElementTree
 from contextlib import closing
+from six.moves import intern
+
+try:
+    # C implementation of ElementTree, Python 3.3+ uses it automatically.
+    from xml.etree import cElementTree as ElementTree
+except ImportError:
+    from xml.etree import ElementTree
 
 from . import constants
 
 Protocol = namedtuple('Protocol', ['result', 'points', 'compile_log', 'tests'])
 ProtocolTest = namedtuple('ProtocolTest', ['name', 'result', 'time', 'details'])
 
+# Only plain binary files expose the submitted bytes through fileno(), decoding wrappers are read instead.
+# Pipes and procfs-style files match these types too, see JudgeClient._can_sendfile.
+SENDFILE_TYPES = (io.FileIO, io.BufferedReader, io.BufferedRandom)
+
+
+def _intern(value):
+    """Interns repeated protocol values, Python 2 can intern only byte strings."""
+    return intern(value) if isinstance(value, str) else value
+
 
 class JudgeClient(object):
+    SEND_CHUNK_SIZE = 64 * 1024
 
     def __init__(self, tester_id, tester_url, tester_port):
         """Initializes JudgeClient instance.
@@ -32,9 +51,13 @@ class JudgeClient(object):
         :param submit_id: unique id of the submit.
         :param user_id: user id for the judge system in form of contestid-userid.
         :param task_id: task id for the judge system in form of contestid-taskid.
-        :param submission_content: submission file content uploaded by user.
+        :param submission_content: submission file content uploaded by user or a file-like object to stream it from.
         :param language: programming language for the submission_file.
         :returns: submit_id
+
+        Errors raised while reading a file-like submission are propagated unchanged. The judge treats
+        the closed connection as the end of the submission, so a stream failing partway can leave
+        a truncated submission queued on the judge.
         """
 
         header = self._create_header(submit_id, user_id, task_id, language, priority)
@@ -66,22 +89,16 @@ class JudgeClient(object):
                 compile_log=compile_log.text,
                 tests=tuple())
 
-        result = constants.SUBMIT_RESPONSE_OK
-        tests = []
         run_log = tree.find("runLog")
-        for test in run_log:
-            if test.tag != 'test':
-                continue
-            test_result = test[2].text
-            details = test[4].text if len(test) > 4 else None
-            tests.append(ProtocolTest(name=test[0].text,
-                                      result=test_result,
-                                      time=test[3].text,
-                                      details=details))
-            if test_result != constants.SUBMIT_RESPONSE_OK and result == constants.SUBMIT_RESPONSE_OK:
-                result = test_result
+        tests = [ProtocolTest(name=test[0].text,
+                              result=_intern(test[2].text),
+                              time=test[3].text,
+                              details=test[4].text if len(test) > 4 else None)
+                 for test in run_log.iterfind('test')]
+        result = next((test.result for test in tests if test.result != constants.SUBMIT_RESPONSE_OK),
+                      constants.SUBMIT_RESPONSE_OK)
         try:
-            score = Decimal(tree.find("runLog/score").text)
+            score = Decimal(run_log.find("score").text)
         except (ValueError, TypeError, AttributeError):
             raise ProtocolFormatError("Invalid score.", protocol_content)
         points = (max_points * score) / Decimal(100)
@@ -107,16 +124,68 @@ class JudgeClient(object):
             return bytes(s)
         return s.encode('utf-8')
 
-    def _send_data_to_server(self, header, submission_file_content):
-        """Sends submission to the judge system."""
+    def _connection_error(self):
+        return JudgeConnectionError(
+            'Failed to connect to judge system (%s:%s)' % (self.tester_url, self.tester_port))
+
+    def _connect(self):
+        """Opens a socket to the judge system."""
+        sock = None
         try:
-            with closing(socket.socket(socket.AF_INET, socket.SOCK_STREAM)) as sock:
-                sock.connect((self.tester_url, self.tester_port))
-                sock.sendall(self._encode(header))
-                sock.sendall(self._encode(submission_file_content))
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.connect((self.tester_url, self.tester_port))
         except socket.error:
-            raise JudgeConnectionError(
-                'Failed to connect to judge system (%s:%s)' % (self.tester_url, self.tester_port))
+            if sock is not None:
+                sock.close()
+            raise self._connection_error()
+        return sock
+
+    def _sendall(self, sock, data):
+        data = self._encode(data)
+        try:
+            sock.sendall(data)
+        except socket.error:
+            raise self._connection_error()
+
+    def _can_sendfile(self, sock, submission_file):
+        """Checks whether submission is a non-empty regular file the kernel can send directly."""
+        if not hasattr(sock, 'sendfile') or not isinstance(submission_file, SENDFILE_TYPES):
+            return False
+        try:
+            if not submission_file.seekable():
+                return False
+            file_stat = os.fstat(submission_file.fileno())
+        except (IOError, OSError, ValueError):
+            return False
+        return stat.S_ISREG(file_stat.st_mode) and file_stat.st_size > 0
+
+    def _send_file(self, sock, submission_file):
+        """Streams file-like submission to the socket without loading it into memory at once.
+
+        Only socket failures are turned into JudgeConnectionError, errors from reading the file are raised unchanged.
+        """
+        if self._can_sendfile(sock, submission_file):
+            offset = submission_file.tell()
+            try:
+                # Binary files on disk are handed to the kernel directly (os.sendfile where supported).
+                sock.sendfile(submission_file, offset=offset)
+            except socket.error:
+                raise self._connection_error()
+            return
+        while True:
+            chunk = submission_file.read(self.SEND_CHUNK_SIZE)
+            if not chunk:
+                break
+            self._sendall(sock, chunk)
+
+    def _send_data_to_server(self, header, submission_file_content):
+        """Sends submission to the judge system."""
+        with closing(self._connect()) as sock:
+            self._sendall(sock, header)
+            if hasattr(submission_file_content, 'read'):
+                self._send_file(sock, submission_file_content)
+            else:
+                self._sendall(sock, submission_file_content)
 
 
 class DebugJudgeClient(JudgeClient):
@@ -124,6 +193,8 @@ class DebugJudgeClient(JudgeClient):
         super(DebugJudgeClient, self).__init__('TEST_ID', 'TEST_URL', 47)
 
     def _send_data_to_server(self, header, submission_file_content):
+        if hasattr(submission_file_content, 'read'):
+            submission_file_content = submission_file_content.read()
         print('Submit RAW:')
         print(self._encode(header))
         print(self._encode(submission_file_content))
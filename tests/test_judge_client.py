@@ -1,12 +1,16 @@
 # coding=utf-8
 from __future__ import unicode_literals
 
+import io
+import os
+import gzip
 import time
 import socket
+import tempfile
 import threading
 
 from contextlib import closing
-from unittest import TestCase
+from unittest import TestCase, skipUnless
 from judge_client.client import JudgeClient, ProtocolCorruptedError, ProtocolFormatError
 
 
@@ -30,9 +34,13 @@ class JudgeClientTests(TestCase):
                 server_sock.bind((test.TESTER_URL, self.port))
                 server_sock.listen(0)
                 conn, addr = server_sock.accept()
-                raw = conn.recv(2048)
-                data = conn.recv(2048)
-                test.received = raw + data
+                chunks = []
+                while True:
+                    data = conn.recv(2048)
+                    if not data:
+                        break
+                    chunks.append(data)
+                test.received = b''.join(chunks)
                 time.sleep(100.0 / 1000.0)
 
         self.judge_client = JudgeClient(self.TESTER_ID, self.TESTER_URL, self.port)
@@ -73,7 +81,110 @@ class JudgeClientTests(TestCase):
         self.assertEqual(request_parts[7], b'magic_footer')
         # Submission
         self.assertEqual(request_parts[8], b'test_submission')
-   
+
+    def submit_file(self, submission_file):
+        """Submits file-like object and returns the arguments of socket.sendfile calls made meanwhile."""
+        sendfile_calls = []
+        original_sendfile = getattr(socket.socket, 'sendfile', None)
+
+        def sendfile(sock, *args, **kwargs):
+            sendfile_calls.append(args)
+            return original_sendfile(sock, *args, **kwargs)
+
+        if original_sendfile is not None:
+            socket.socket.sendfile = sendfile
+        try:
+            self.judge_client.submit('test_id', 'test_user', 'test_task', submission_file, 'py')
+        finally:
+            if original_sendfile is not None:
+                socket.socket.sendfile = original_sendfile
+        self.server_thread.join()
+        return sendfile_calls
+
+    def test_submit_file(self):
+        content = b'test_submission' * 10000
+        sendfile_calls = self.submit_file(io.BytesIO(content))
+
+        request_parts = self.received.split(b'\n')
+        self.assertEqual(request_parts[0], b'submit1.3')
+        self.assertEqual(request_parts[7], b'magic_footer')
+        # Submission
+        self.assertEqual(request_parts[8], content)
+        self.assertEqual(sendfile_calls, [])
+
+    def test_submit_unreadable_file_raises_read_error(self):
+        with open(os.devnull, 'wb') as submission_file:
+            with self.assertRaises(io.UnsupportedOperation):
+                self.judge_client.submit('test_id', 'test_user', 'test_task', submission_file, 'py')
+        self.server_thread.join()
+
+    @skipUnless(hasattr(socket.socket, 'sendfile'), 'socket.sendfile is not available')
+    def test_submit_binary_file(self):
+        content = b'test_submission' * 10000
+        with tempfile.TemporaryFile() as submission_file:
+            submission_file.write(content)
+            submission_file.seek(0)
+            sendfile_calls = self.submit_file(submission_file)
+
+        request_parts = self.received.split(b'\n')
+        self.assertEqual(request_parts[7], b'magic_footer')
+        # Submission
+        self.assertEqual(request_parts[8], content)
+        self.assertEqual(len(sendfile_calls), 1)
+
+    @skipUnless(hasattr(socket.socket, 'sendfile'), 'socket.sendfile is not available')
+    def test_submit_binary_file_from_current_position(self):
+        with tempfile.TemporaryFile() as submission_file:
+            submission_file.write(b'HEADERBODY')
+            submission_file.seek(6)
+            sendfile_calls = self.submit_file(submission_file)
+
+        request_parts = self.received.split(b'\n')
+        self.assertEqual(request_parts[7], b'magic_footer')
+        # Submission
+        self.assertEqual(request_parts[8], b'BODY')
+        self.assertEqual(len(sendfile_calls), 1)
+
+    def test_submit_gzip_file(self):
+        content = b'test_submission' * 10000
+        with tempfile.NamedTemporaryFile(suffix='.gz') as compressed_file:
+            with gzip.GzipFile(fileobj=compressed_file, mode='wb') as gzip_file:
+                gzip_file.write(content)
+            compressed_file.flush()
+            with gzip.open(compressed_file.name, 'rb') as submission_file:
+                sendfile_calls = self.submit_file(submission_file)
+
+        request_parts = self.received.split(b'\n')
+        self.assertEqual(request_parts[7], b'magic_footer')
+        # Submission is sent decompressed
+        self.assertEqual(request_parts[8], content)
+        self.assertEqual(sendfile_calls, [])
+
+    def test_submit_pipe(self):
+        content = b'test_submission' * 1000
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, content)
+        os.close(write_fd)
+        with os.fdopen(read_fd, 'rb') as submission_file:
+            sendfile_calls = self.submit_file(submission_file)
+
+        request_parts = self.received.split(b'\n')
+        self.assertEqual(request_parts[7], b'magic_footer')
+        # Submission
+        self.assertEqual(request_parts[8], content)
+        self.assertEqual(sendfile_calls, [])
+
+    @skipUnless(os.path.exists('/proc/self/status'), 'procfs is not available')
+    def test_submit_procfs_file(self):
+        # Procfs files report zero size, so they have to be read instead of sent by the kernel.
+        with open('/proc/self/status', 'rb') as submission_file:
+            sendfile_calls = self.submit_file(submission_file)
+
+        request_parts = self.received.split(b'\n')
+        self.assertEqual(request_parts[7], b'magic_footer')
+        # Submission
+        self.assertTrue(request_parts[8].startswith(b'Name:'))
+        self.assertEqual(sendfile_calls, [])
 
 class ProtocolParsingTests(TestCase):
     def test_parse_protocol(self):
@@ -100,6 +211,8 @@ class ProtocolParsingTests(TestCase):
         self.assertEqual(parsed_protocol.result, 'WA')
         self.assertEqual(parsed_protocol.points, 25)
         self.assertEqual(len(parsed_protocol.tests), 10)
+        # Repeated results share a single string object.
+        self.assertIs(parsed_protocol.tests[0].result, parsed_protocol.tests[1].result)
 
     def test_parse_corrupted_protocol_rises(self):
         self.judge_client = JudgeClient(